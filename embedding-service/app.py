@@ -4,18 +4,27 @@ Multilingual Sentence Embedding Microservice
 Uses all-MiniLM-L6-v2 model for generating embeddings
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from sentence_transformers import SentenceTransformer
 from transformers import pipeline
+import torch
 import numpy as np
+import orjson
+import simsimd
+import io
 import logging
+import math
 import os
-import re
+import struct
 from uuid import UUID
+from sqlalchemy import select, text as sql_text
 from sqlalchemy.exc import SQLAlchemyError
 
 from database import init_database, get_db_session, health_check as db_health_check
 from models import Article
+from batching import EncodeBatcher
+from embedding_cache import EmbeddingCache
+from text_cleaning import clean_text_for_classification
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -23,16 +32,125 @@ logger = logging.getLogger(__name__)
 
 # Load the multilingual sentence transformer model
 MODEL_NAME = "all-MiniLM-L6-v2"
+ONNX_MODEL_NAME = f"sentence-transformers/{MODEL_NAME}"
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'onnx').lower()
+EMBEDDING_DIMENSION = 384
+EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', os.cpu_count() or 1))
+TORCH_COMPILE = os.getenv('TORCH_COMPILE', 'true').lower() == 'true'
+# 'load' warms up in the loading process; gunicorn sets 'worker' to warm up after fork
+EMBEDDING_WARMUP = os.getenv('EMBEDDING_WARMUP', 'load').lower()
+WARMUP_TEXTS = ["warmup text"] * 8 + ["A longer warmup sentence so compiled kernels also see a wider padded batch."] * 8
 CLASSIFIER_MODEL_NAME = "distilbert-base-uncased-finetuned-sst-2-english"
+CLASSIFIER_BATCH_SIZE = 32
+# Batches at least this large are streamed with binary COPY instead of a VALUES list
+COPY_THRESHOLD = int(os.getenv('EMBEDDING_COPY_THRESHOLD', 1000))
+_PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+_PGCOPY_TRAILER = struct.pack('>h', -1)
 model = None
 classifier = None
+encoder = None
+embedding_cache = EmbeddingCache()
+
+def encode_texts(texts, batch_size=None):
+    """Encode a list of texts into unit-norm float32 embeddings"""
+    batch_size = batch_size or len(texts)
+    if not isinstance(model, SentenceTransformer):
+        return model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    with torch.inference_mode():
+        embeddings = model.encode(texts, batch_size=batch_size, convert_to_tensor=True,
+                                  normalize_embeddings=True, show_progress_bar=False)
+    # Half-precision models produce fp16/bf16 tensors, which numpy cannot hold directly
+    return embeddings.float().cpu().numpy()
+
+def embed_text(text):
+    """Embed a single text through the cache and the micro-batching queue"""
+    key = embedding_cache.key(text)
+    embedding = embedding_cache.get(key)
+    if embedding is None:
+        embedding = encoder.submit(text).result()
+        embedding_cache.put(key, embedding)
+    return embedding
+
+def embed_texts(texts, batch_size=None):
+    """Embed many texts, encoding only those not already cached"""
+    keys = [embedding_cache.key(text) for text in texts]
+    embeddings = [embedding_cache.get(key) for key in keys]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        fresh = encode_texts([texts[i] for i in missing], batch_size)
+        for i, embedding in zip(missing, fresh):
+            embeddings[i] = embedding
+            embedding_cache.put(keys[i], embedding)
+    return np.stack(embeddings) if embeddings else np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+
+def configure_inference_threads():
+    """Cap torch intra-op threads for this process.
+
+    The classifier always runs on torch, whatever the embedding backend, and
+    several request threads can run it at once. Called at load time and again
+    in each gunicorn worker after fork.
+    """
+    torch.set_num_threads(EMBEDDING_THREADS)
+
+def optimize_torch_model(st_model):
+    """Run the PyTorch encoder in reduced precision where the hardware supports it"""
+    torch.backends.mkldnn.enabled = True
+    if torch.cuda.is_available():
+        logger.info("CUDA available, running embedding model in FP16")
+        st_model.half()
+    elif torch.cpu._is_avx512_bf16_supported():
+        logger.info("AVX-512 BF16 available, running embedding model in BF16")
+        st_model[0].auto_model = st_model[0].auto_model.to(torch.bfloat16)
+    else:
+        logger.info("No FP16/BF16 support detected, running embedding model in FP32")
+    st_model.eval()
+    if TORCH_COMPILE:
+        compile_torch_model(st_model)
+    return st_model
+
+def compile_torch_model(st_model):
+    """JIT-compile the transformer, keeping the eager module if compilation fails"""
+    eager_model = st_model[0].auto_model
+    st_model[0].auto_model = torch.compile(eager_model, dynamic=True)
+    try:
+        # Compilation happens on the first call, so trigger it here
+        with torch.inference_mode():
+            st_model.encode(WARMUP_TEXTS, show_progress_bar=False)
+        logger.info("Embedding model compiled with torch.compile")
+    except Exception as e:
+        logger.warning(f"torch.compile failed, using eager model: {e}")
+        st_model[0].auto_model = eager_model
+    return st_model
+
+def load_embedding_model():
+    """Load the INT8 ONNX encoder, falling back to the PyTorch model"""
+    if EMBEDDING_BACKEND == 'onnx':
+        try:
+            from onnx_encoder import OnnxSentenceEncoder
+            return OnnxSentenceEncoder(ONNX_MODEL_NAME)
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable, falling back to PyTorch: {e}")
+    return optimize_torch_model(SentenceTransformer(MODEL_NAME))
+
+def warm_up_model():
+    """Encode synthetic batches so the first real request doesn't pay one-time initialization costs.
+
+    Per-process state such as the ONNX session is created here, so under
+    gunicorn this must run in each worker rather than in the master.
+    """
+    encode_texts(WARMUP_TEXTS)
+    logger.info(f"Embedding model warmed up in process {os.getpid()}")
 
 def load_model():
     """Load the sentence transformer model and classifier"""
-    global model, classifier
+    global model, classifier, encoder
     try:
-        logger.info(f"Loading embedding model: {MODEL_NAME}")
-        model = SentenceTransformer(MODEL_NAME)
+        configure_inference_threads()
+        logger.info(f"Loading embedding model: {MODEL_NAME} (backend: {EMBEDDING_BACKEND})")
+        model = load_embedding_model()
+        encoder = EncodeBatcher(encode_texts).start()
+        if EMBEDDING_WARMUP == 'load':
+            warm_up_model()
         logger.info("Embedding model loaded successfully")
         
         logger.info(f"Loading classifier model: {CLASSIFIER_MODEL_NAME}")
@@ -58,6 +176,16 @@ def initialize():
 with app.app_context():
     initialize()
 
+def orjson_response(payload, status=200):
+    """Build a JSON response with orjson, serializing numpy arrays natively"""
+    return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+                    status=status, mimetype='application/json')
+
+def wants_binary_response():
+    """Whether the client prefers raw octet-stream embeddings over JSON"""
+    best = request.accept_mimetypes.best_match(['application/json', 'application/octet-stream'])
+    return best == 'application/octet-stream'
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -86,15 +214,13 @@ def generate_embedding():
         
         # Generate embedding
         logger.info(f"Generating embedding for text: {text[:50]}...")
-        embedding = model.encode([text.strip()])[0]
+        embedding = embed_text(text.strip())
         
-        # Convert to list for JSON serialization
-        embedding_list = embedding.tolist()
-        
-        return jsonify({
+        # Serialize the ndarray directly from its buffer
+        return orjson_response({
             "text": text,
-            "embedding": embedding_list,
-            "dimension": len(embedding_list)
+            "embedding": embedding,
+            "dimension": len(embedding)
         })
         
     except Exception as e:
@@ -121,17 +247,24 @@ def generate_batch_embeddings():
         
         logger.info(f"Generating embeddings for {len(clean_texts)} texts")
         
-        # Generate embeddings in batch (more efficient)
-        embeddings = model.encode(clean_texts)
+        # Generate embeddings in batch (more efficient); unit-norm so cosine == dot
+        embeddings = embed_texts(clean_texts, batch_size=32)
         
-        # Convert to list for JSON serialization
-        embeddings_list = [emb.tolist() for emb in embeddings]
+        # Raw float16 bytes for clients that ask for them
+        if wants_binary_response():
+            embeddings_fp16 = np.ascontiguousarray(embeddings, dtype='<f2')
+            return Response(
+                embeddings_fp16.tobytes(),
+                mimetype='application/octet-stream',
+                headers={'X-Shape': f'{embeddings_fp16.shape[0]},{embeddings_fp16.shape[1]}'}
+            )
         
-        return jsonify({
+        # Serialize the ndarray directly from its buffer
+        return orjson_response({
             "texts": clean_texts,
-            "embeddings": embeddings_list,
-            "count": len(embeddings_list),
-            "dimension": len(embeddings_list[0]) if embeddings_list else 0
+            "embeddings": embeddings,
+            "count": len(embeddings),
+            "dimension": embeddings.shape[1] if len(embeddings) else 0
         })
         
     except Exception as e:
@@ -147,21 +280,18 @@ def calculate_similarity():
         if not data or 'embedding1' not in data or 'embedding2' not in data:
             return jsonify({"error": "Missing embedding1 or embedding2 fields"}), 400
         
-        emb1 = np.array(data['embedding1'])
-        emb2 = np.array(data['embedding2'])
-        
-        if emb1.shape != emb2.shape:
+        if len(data['embedding1']) != len(data['embedding2']):
             return jsonify({"error": "Embedding dimensions don't match"}), 400
         
-        # Calculate cosine similarity
-        dot_product = np.dot(emb1, emb2)
-        norm1 = np.linalg.norm(emb1)
-        norm2 = np.linalg.norm(emb2)
+        emb1 = np.asarray(data['embedding1'], dtype=np.float32)
+        emb2 = np.asarray(data['embedding2'], dtype=np.float32)
         
-        if norm1 == 0 or norm2 == 0:
-            similarity = 0.0
+        # Calculate cosine similarity (single sqrt over the product of squared norms)
+        norms_squared = np.vdot(emb1, emb1) * np.vdot(emb2, emb2)
+        if norms_squared > 0:
+            similarity = np.dot(emb1, emb2) / math.sqrt(norms_squared)
         else:
-            similarity = dot_product / (norm1 * norm2)
+            similarity = 0.0
         
         return jsonify({
             "similarity": float(similarity)
@@ -171,6 +301,44 @@ def calculate_similarity():
         logger.error(f"Error calculating similarity: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/similarity/batch', methods=['POST'])
+def calculate_batch_similarity():
+    """Calculate cosine similarity between a query embedding and a matrix of embeddings.
+
+    Embeddings returned by this service are already unit-norm, so for those
+    cosine similarity equals the dot product.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'query' not in data or 'matrix' not in data:
+            return jsonify({"error": "Missing query or matrix fields"}), 400
+        
+        matrix_data = data['matrix']
+        if not isinstance(matrix_data, list) or not matrix_data:
+            return jsonify({"error": "Empty or invalid matrix"}), 400
+        
+        query = np.asarray(data['query'], dtype=np.float32)
+        try:
+            matrix = np.ascontiguousarray(matrix_data, dtype=np.float32)
+        except ValueError:
+            return jsonify({"error": "Matrix rows must have equal dimensions"}), 400
+        
+        if query.ndim != 1 or matrix.ndim != 2 or matrix.shape[1] != query.shape[0]:
+            return jsonify({"error": "Embedding dimensions don't match"}), 400
+        
+        distances = simsimd.cdist(query.reshape(1, -1), matrix, metric='cosine')
+        similarities = 1.0 - np.asarray(distances).ravel()
+        
+        return orjson_response({
+            "similarities": similarities,
+            "count": len(similarities)
+        })
+        
+    except Exception as e:
+        logger.error(f"Error calculating batch similarity: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route('/classify', methods=['POST'])
 def classify_content():
     """Classify if content is article-worthy using ML model"""
@@ -187,6 +355,21 @@ def classify_content():
         # Clean and prepare text for classification
         cleaned_text = clean_text_for_classification(text)
         
+        # Skip the classifier for text too short to ever score as an article
+        if is_trivial_text(text):
+            return jsonify({
+                "text": text[:100] + "..." if len(text) > 100 else text,
+                "is_article": False,
+                "confidence": 0.0,
+                "classification_details": {
+                    "sentiment_scores": [],
+                    "text_length": len(text),
+                    "cleaned_text_length": len(cleaned_text),
+                    "word_count": text_statistics(cleaned_text)[0],
+                    "skipped_classifier": True
+                }
+            })
+        
         logger.info(f"Classifying content quality for text: {cleaned_text[:50]}...")
         
         # Use the classifier to determine content quality
@@ -206,7 +389,7 @@ def classify_content():
                 "sentiment_scores": result,
                 "text_length": len(text),
                 "cleaned_text_length": len(cleaned_text),
-                "word_count": len(cleaned_text.split())
+                "word_count": text_statistics(cleaned_text)[0]
             }
         })
         
@@ -240,12 +423,21 @@ def classify_batch_content():
         
         logger.info(f"Batch classifying {len(clean_texts)} texts")
         
-        # Classify all texts
+        # Only texts long enough to possibly be articles go through the classifier
+        needs_model = [i for i, index in enumerate(original_indices) if not is_trivial_text(texts[index])]
+        classification_results = [None] * len(clean_texts)
+        if needs_model:
+            model_results = classify_texts([clean_texts[i] for i in needs_model])
+            for i, classification_result in zip(needs_model, model_results):
+                classification_results[i] = classification_result
+        
         results = []
-        for i, cleaned_text in enumerate(clean_texts):
+        for i, classification_result in enumerate(classification_results):
             original_text = texts[original_indices[i]]
-            classification_result = classifier(cleaned_text)
-            article_score = calculate_article_score(original_text, classification_result)
+            if classification_result is None:
+                article_score = 0.0
+            else:
+                article_score = calculate_article_score(original_text, classification_result)
             
             results.append({
                 "text": original_text[:100] + "..." if len(original_text) > 100 else original_text,
@@ -264,72 +456,80 @@ def classify_batch_content():
         logger.error(f"Error in batch classification: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
-def clean_text_for_classification(text):
-    """Clean text for better classification results"""
-    # Remove excessive whitespace and newlines
-    text = re.sub(r'\s+', ' ', text.strip())
-    
-    # Remove URLs
-    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-    
-    # Remove email addresses
-    text = re.sub(r'\S+@\S+', '', text)
-    
-    # Truncate very long text for the classifier (BERT has token limits)
-    if len(text) > 500:
-        # Take first 400 chars and last 100 chars to preserve context
-        text = text[:400] + " " + text[-100:]
-    
-    return text.strip()
+def is_trivial_text(text):
+    """Whether text is too short to score above 0.5 whatever the classifier says.
+
+    Under 50 characters and 20 words the length penalties (-0.3) outweigh the
+    best possible sentiment and structure bonuses (+0.25).
+    """
+    stripped = text.strip()
+    return len(stripped) < 50 and text_statistics(stripped)[0] < 20
+
+def classify_texts(texts):
+    """Run the classifier over many texts, sorted by length to minimize padding.
+
+    Results are returned in input order, each shaped like a single-text call.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    sorted_results = classifier([texts[i] for i in order],
+                                batch_size=min(CLASSIFIER_BATCH_SIZE, len(texts)),
+                                truncation=True)
+    results = [None] * len(texts)
+    for position, i in enumerate(order):
+        results[i] = [sorted_results[position]]
+    return results
+
+# Byte lookup tables for single-pass text statistics
+_STRUCTURE_LUT = np.zeros(256, dtype=bool)
+_STRUCTURE_LUT[[ord(c) for c in ".!?:;,"]] = True
+_WHITESPACE_LUT = np.zeros(256, dtype=bool)
+# The ASCII characters str.split() treats as whitespace, including the \x1c-\x1f separators
+_WHITESPACE_LUT[[ord(c) for c in " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"]] = True
+
+def text_statistics(text):
+    """Return (word_count, structure_count) from one vectorized pass over the UTF-8 bytes"""
+    data = np.frombuffer(text.encode('utf-8', 'ignore'), dtype=np.uint8)
+    structure_count = int(_STRUCTURE_LUT[data].sum())
+    if not text.isascii():
+        # Non-ASCII whitespace (e.g. U+3000, U+00A0) also separates words
+        return len(text.split()), structure_count
+    whitespace = _WHITESPACE_LUT[data]
+    # A word starts at every non-whitespace byte preceded by whitespace or the start of text
+    word_starts = ~whitespace
+    word_starts[1:] &= whitespace[:-1]
+    return int(word_starts.sum()), structure_count
+
+# Score adjustment bands, looked up with searchsorted(side='right'):
+# adjustment i applies when thresholds[i-1] <= value < thresholds[i]
+_LENGTH_THRESHOLDS = np.array([50, 201, 501, 1001])    # <50, 50-200, 201-500, 501-1000, >1000 chars
+_LENGTH_ADJUSTMENTS = np.array([-0.2, 0.0, 0.1, 0.2, 0.3])
+_WORD_THRESHOLDS = np.array([20, 101, 201])            # <20, 20-100, 101-200, >200 words
+_WORD_ADJUSTMENTS = np.array([-0.1, 0.0, 0.1, 0.2])
+_STRUCTURE_THRESHOLDS = np.array([6, 11])              # <=5, 6-10, >10 punctuation marks
+_STRUCTURE_ADJUSTMENTS = np.array([0.0, 0.05, 0.1])
 
 def calculate_article_score(original_text, sentiment_result):
     """Calculate article-worthiness score based on multiple factors"""
-    base_score = 0.0
-    
     # Factor 1: Text length (longer text is more likely to be an article)
     text_length = len(original_text.strip())
-    if text_length > 1000:
-        base_score += 0.3
-    elif text_length > 500:
-        base_score += 0.2
-    elif text_length > 200:
-        base_score += 0.1
-    elif text_length < 50:
-        base_score -= 0.2  # Very short text is less likely to be an article
+    length_score = _LENGTH_ADJUSTMENTS[np.searchsorted(_LENGTH_THRESHOLDS, text_length, side='right')]
     
     # Factor 2: Word count
-    word_count = len(original_text.split())
-    if word_count > 200:
-        base_score += 0.2
-    elif word_count > 100:
-        base_score += 0.1
-    elif word_count < 20:
-        base_score -= 0.1
+    word_count, structure_count = text_statistics(original_text)
+    word_score = _WORD_ADJUSTMENTS[np.searchsorted(_WORD_THRESHOLDS, word_count, side='right')]
     
     # Factor 3: Sentiment analysis results (well-written content tends to be more neutral/positive)
-    if sentiment_result and len(sentiment_result) > 0:
-        # Get the confidence of the positive sentiment
-        for result in sentiment_result[0]:  # sentiment_result is a list of lists
-            if result['label'] == 'POSITIVE':
-                # Higher positive sentiment confidence suggests better written content
-                positive_confidence = result['score']
-                base_score += (positive_confidence - 0.5) * 0.3  # Scale between -0.15 to +0.15
-            elif result['label'] == 'NEGATIVE':
-                # Very negative sentiment might indicate poor quality
-                negative_confidence = result['score']
-                if negative_confidence > 0.8:
-                    base_score -= 0.1
+    # sentiment_result is a list of lists of {label, score}
+    scores = {result['label']: result['score'] for result in sentiment_result[0]} if sentiment_result else {}
+    # Higher positive confidence suggests better written content (-0.15 to +0.15);
+    # very negative sentiment might indicate poor quality
+    sentiment_score = (scores.get('POSITIVE', 0.5) - 0.5) * 0.3 - (scores.get('NEGATIVE', 0.0) > 0.8) * 0.1
     
     # Factor 4: Basic structure indicators
-    structure_indicators = ['.', '!', '?', ':', ';', ',']
-    structure_count = sum(original_text.count(indicator) for indicator in structure_indicators)
-    if structure_count > 10:
-        base_score += 0.1
-    elif structure_count > 5:
-        base_score += 0.05
+    structure_score = _STRUCTURE_ADJUSTMENTS[np.searchsorted(_STRUCTURE_THRESHOLDS, structure_count, side='right')]
     
-    # Ensure score is between 0 and 1
-    return max(0.0, min(1.0, base_score + 0.5))  # Add 0.5 as base to be more generous
+    # Ensure score is between 0 and 1 (0.5 base to be more generous)
+    return float(np.clip(0.5 + length_score + word_score + sentiment_score + structure_score, 0.0, 1.0))
 
 @app.route('/articles/<article_id>/embedding', methods=['POST'])
 def generate_and_store_embedding(article_id):
@@ -349,11 +549,31 @@ def generate_and_store_embedding(article_id):
         if not text:
             return jsonify({"error": "Empty text provided"}), 400
         
+        force = data.get('force', False)
+        if not isinstance(force, bool):
+            return jsonify({"error": "'force' must be a boolean"}), 400
+        
+        # Skip the forward pass for articles that already have an embedding
+        with get_db_session() as session:
+            existing = session.query(Article.embedding_status, Article.embedding.isnot(None)) \
+                .filter(Article.id == article_uuid).first()
+        if not existing:
+            return jsonify({"error": "Article not found"}), 404
+        
+        embedding_status, has_embedding = existing
+        if embedding_status == 'success' and has_embedding and not force:
+            logger.info(f"Embedding already stored for article {article_id}, skipping")
+            return jsonify({
+                "article_id": article_id,
+                "embedding_dimension": EMBEDDING_DIMENSION,
+                "embedding_status": "success",
+                "message": "Embedding already stored"
+            })
+        
         logger.info(f"Generating and storing embedding for article {article_id}")
         
         # Generate embedding
-        embedding = model.encode([text])[0]
-        embedding_list = embedding.tolist()
+        embedding = embed_text(text)
         
         # Store in database
         with get_db_session() as session:
@@ -362,8 +582,8 @@ def generate_and_store_embedding(article_id):
             if not article:
                 return jsonify({"error": "Article not found"}), 404
             
-            # Update embedding fields
-            article.embedding = embedding_list
+            # Update embedding fields (the pgvector adapter takes a list)
+            article.embedding = embedding.tolist()
             article.embedding_status = 'success'
             
             session.commit()
@@ -372,7 +592,7 @@ def generate_and_store_embedding(article_id):
         
         return jsonify({
             "article_id": article_id,
-            "embedding_dimension": len(embedding_list),
+            "embedding_dimension": len(embedding),
             "embedding_status": "success",
             "message": "Embedding generated and stored successfully"
         })
@@ -384,6 +604,73 @@ def generate_and_store_embedding(article_id):
         logger.error(f"Error generating embedding for article {article_id}: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+def to_pgvector_literal(embedding):
+    """Format an embedding as a pgvector text literal (Postgres rounds it to halfvec)"""
+    # str() of a float32 scalar prints the shortest round-trip form at float32 precision
+    return '[' + ','.join(map(str, np.asarray(embedding, dtype=np.float32))) + ']'
+
+def find_existing_article_ids(session, article_uuids):
+    """Return the subset of the given article UUIDs that exist, in one query"""
+    unique_uuids = set(article_uuids)
+    if not unique_uuids:
+        return set()
+    return set(session.execute(select(Article.id).where(Article.id.in_(unique_uuids))).scalars())
+
+def build_embedding_copy_buffer(rows):
+    """Encode (article_uuid, embedding) pairs in PostgreSQL binary COPY format.
+
+    The halfvec wire format is int16 dimension, int16 unused, then one
+    big-endian float16 per element.
+    """
+    buffer = io.BytesIO()
+    buffer.write(_PGCOPY_HEADER)
+    for article_uuid, embedding in rows:
+        values = np.asarray(embedding, dtype='>f2')
+        buffer.write(struct.pack('>hi', 2, 16))
+        buffer.write(article_uuid.bytes)
+        buffer.write(struct.pack('>ihh', 4 + values.nbytes, len(values), 0))
+        buffer.write(values.tobytes())
+    buffer.write(_PGCOPY_TRAILER)
+    buffer.seek(0)
+    return buffer
+
+def copy_update_embeddings(session, rows):
+    """Stream embeddings into a temp table with binary COPY, then UPDATE from it"""
+    session.execute(sql_text(
+        f"CREATE TEMP TABLE _article_embeddings (id uuid, emb halfvec({EMBEDDING_DIMENSION})) ON COMMIT DROP"
+    ))
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert("COPY _article_embeddings (id, emb) FROM STDIN WITH (FORMAT BINARY)",
+                           build_embedding_copy_buffer(rows))
+    finally:
+        cursor.close()
+    session.execute(sql_text(
+        "UPDATE articles SET embedding = e.emb, embedding_status = 'success', updated_at = now() "
+        "FROM _article_embeddings e WHERE articles.id = e.id"
+    ))
+
+def bulk_update_embeddings(session, rows):
+    """Store (article_uuid, embedding) pairs with a single UPDATE ... FROM (VALUES ...)"""
+    if not rows:
+        return
+    # An UPDATE ... FROM with duplicate IDs applies an arbitrary row; keep the last one
+    latest = dict(rows)
+    if len(latest) >= COPY_THRESHOLD:
+        copy_update_embeddings(session, latest.items())
+        return
+    values = []
+    params = {}
+    for i, (article_uuid, embedding) in enumerate(latest.items()):
+        values.append(f"(:id_{i}, :emb_{i})")
+        params[f"id_{i}"] = str(article_uuid)
+        params[f"emb_{i}"] = to_pgvector_literal(embedding)
+    session.execute(sql_text(
+        "UPDATE articles SET embedding = v.emb::halfvec, embedding_status = 'success', updated_at = now() "
+        f"FROM (VALUES {', '.join(values)}) AS v(id, emb) "
+        "WHERE articles.id = v.id::uuid"
+    ), params)
+
 @app.route('/articles/batch/embedding', methods=['POST'])
 def generate_batch_embeddings_and_store():
     """Generate embeddings for multiple articles and store them in the database"""
@@ -398,70 +685,88 @@ def generate_batch_embeddings_and_store():
         
         logger.info(f"Processing batch embedding for {len(articles_data)} articles")
         
-        results = []
-        successful_updates = 0
+        results = [None] * len(articles_data)
+        pending = []
         
+        # Pass 1: validate IDs and texts without touching the database
+        for index, article_data in enumerate(articles_data):
+            if not isinstance(article_data, dict):
+                article_data = {}
+            article_id = article_data.get('id')
+            text = article_data.get('text', '')
+            
+            if not article_id or not text:
+                results[index] = {
+                    "article_id": article_id,
+                    "status": "error",
+                    "message": "Missing article ID or text"
+                }
+                continue
+            
+            if not isinstance(article_id, str) or not isinstance(text, str):
+                results[index] = {
+                    "article_id": article_id,
+                    "status": "error",
+                    "message": "Article ID and text must be strings"
+                }
+                continue
+            
+            text = text.strip()
+            if not text:
+                results[index] = {
+                    "article_id": article_id,
+                    "status": "error",
+                    "message": "Missing article ID or text"
+                }
+                continue
+            
+            # Validate UUID
+            try:
+                article_uuid = UUID(article_id)
+            except (ValueError, TypeError, AttributeError):
+                results[index] = {
+                    "article_id": article_id,
+                    "status": "error", 
+                    "message": "Invalid article ID format"
+                }
+                continue
+            
+            pending.append((index, article_id, article_uuid, text))
+        
+        # Pass 2: generate all embeddings in one batched call, before taking a
+        # connection from the pool so it isn't held during inference
+        embeddings = []
+        if pending:
+            embeddings = embed_texts([text for _, _, _, text in pending], batch_size=64)
+        
+        # Pass 3: a short session to check existence and store everything
+        rows = []
         with get_db_session() as session:
-            for article_data in articles_data:
-                try:
-                    article_id = article_data.get('id')
-                    text = article_data.get('text', '').strip()
-                    
-                    if not article_id or not text:
-                        results.append({
-                            "article_id": article_id,
-                            "status": "error",
-                            "message": "Missing article ID or text"
-                        })
-                        continue
-                    
-                    # Validate UUID
-                    try:
-                        article_uuid = UUID(article_id)
-                    except ValueError:
-                        results.append({
-                            "article_id": article_id,
-                            "status": "error", 
-                            "message": "Invalid article ID format"
-                        })
-                        continue
-                    
-                    # Generate embedding
-                    embedding = model.encode([text])[0]
-                    embedding_list = embedding.tolist()
-                    
-                    # Find and update article
-                    article = session.query(Article).filter(Article.id == article_uuid).first()
-                    if not article:
-                        results.append({
-                            "article_id": article_id,
-                            "status": "error",
-                            "message": "Article not found"
-                        })
-                        continue
-                    
-                    # Update embedding fields
-                    article.embedding = embedding_list
-                    article.embedding_status = 'success'
-                    
-                    successful_updates += 1
-                    results.append({
+            # Check which articles exist with a single query
+            existing_ids = find_existing_article_ids(session, [uuid for _, _, uuid, _ in pending])
+            
+            for (index, article_id, article_uuid, _), embedding in zip(pending, embeddings):
+                if article_uuid not in existing_ids:
+                    results[index] = {
                         "article_id": article_id,
-                        "status": "success",
-                        "embedding_dimension": len(embedding_list)
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"Error processing article {article_id}: {e}")
-                    results.append({
-                        "article_id": article_data.get('id', 'unknown'),
                         "status": "error",
-                        "message": str(e)
-                    })
+                        "message": "Article not found"
+                    }
+                    continue
+                
+                rows.append((article_uuid, embedding))
+                results[index] = {
+                    "article_id": article_id,
+                    "status": "success",
+                    "embedding_dimension": len(embedding)
+                }
             
-            # Commit all successful updates
+            # Store all embeddings with one bulk UPDATE
+            bulk_update_embeddings(session, rows)
             session.commit()
         
+        successful_updates = len(rows)
+        
         logger.info(f"Batch embedding completed: {successful_updates}/{len(articles_data)} successful")
         
         return jsonify({
@@ -0,0 +1,83 @@
+"""
+Server-side micro-batching for the sentence transformer.
+Concurrent requests submit single texts which are coalesced into one encode call.
+"""
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, NamedTuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Batching configuration
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 5
+
+class _EncodeItem(NamedTuple):
+    """A single text waiting to be encoded"""
+    text: str
+    future: Future
+
+class EncodeBatcher:
+    """Collects texts from concurrent callers and encodes them in batches"""
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch: int = MAX_BATCH_SIZE, max_wait_ms: int = MAX_WAIT_MS):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.encode_queue: "queue.Queue[_EncodeItem]" = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def start(self) -> "EncodeBatcher":
+        """Start the background worker thread for the current process"""
+        with self._start_lock:
+            if self._pid != os.getpid():
+                # Threads do not survive fork (gunicorn preload_app), so each
+                # worker process gets its own queue and worker thread
+                self.encode_queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+        return self
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for encoding and return a future resolving to its embedding"""
+        if self._pid != os.getpid():
+            self.start()
+        future = Future()
+        self.encode_queue.put(_EncodeItem(text, future))
+        return future
+
+    def _drain(self) -> List[_EncodeItem]:
+        """Block for the first item, then collect more until the batch is full or the wait expires"""
+        items = [self.encode_queue.get()]
+        try:
+            while len(items) < self.max_batch:
+                items.append(self.encode_queue.get(timeout=self.max_wait))
+        except queue.Empty:
+            pass
+        return items
+
+    def _run(self):
+        """Worker loop: encode queued texts sorted by length to minimize padding"""
+        while True:
+            items = self._drain()
+            try:
+                texts = [item.text for item in items]
+                order = np.argsort([len(t) for t in texts], kind="stable")
+                embeddings = self.encode_fn([texts[o] for o in order])
+                for position, o in enumerate(order):
+                    items[o].future.set_result(embeddings[position])
+            except Exception as e:
+                logger.error(f"Error encoding batch of {len(items)} texts: {e}")
+                for item in items:
+                    if not item.future.done():
+                        item.future.set_exception(e)
@@ -23,6 +23,9 @@ engine = create_engine(
     echo=os.getenv('SQLALCHEMY_ECHO', 'false').lower() == 'true',
     pool_pre_ping=True,  # Enable connection health checks
     pool_recycle=3600,   # Recycle connections every hour
+    pool_size=int(os.getenv('DB_POOL_SIZE', 16)),        # One connection per worker thread, plus headroom
+    max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 8)),
+    pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', 5)),   # Fail fast instead of queueing behind a starved pool
 )
 
 # Create session factory
@@ -0,0 +1,48 @@
+"""
+Content-addressed LRU cache for embeddings.
+Repeated texts are served from memory instead of another forward pass.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import blake3
+import numpy as np
+
+# Cache configuration
+MAX_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', 10000))
+
+class EmbeddingCache:
+    """Thread-safe LRU cache keyed by the BLAKE3 digest of the stripped text"""
+
+    def __init__(self, max_size: int = MAX_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        """Content hash used as the cache key"""
+        return blake3.blake3(text.strip().encode('utf-8')).digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Return the cached embedding and mark it recently used"""
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+            return embedding
+
+    def put(self, key: bytes, embedding: np.ndarray):
+        """Store an embedding, evicting the least recently used entry when full"""
+        if self.max_size <= 0:
+            return
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)  # shared between requests
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
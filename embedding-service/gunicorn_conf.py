@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for the embedding service.
+Usage: gunicorn -c gunicorn_conf.py app:app
+"""
+
+import os
+
+# Server socket
+bind = f"0.0.0.0:{os.getenv('PORT', 8001)}"
+
+# Worker processes: model inference and DB I/O release the GIL, so threads scale
+workers = int(os.getenv('GUNICORN_WORKERS', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+worker_class = 'gthread'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+
+# Load the models once in the master so workers share them copy-on-write
+preload_app = True
+
+# Warm up in each worker after fork; a warm-up in the master builds per-process
+# state (the ONNX session) that the workers cannot reuse
+os.environ.setdefault('EMBEDDING_WARMUP', 'worker')
+
+# Split the cores between workers to avoid oversubscribing the inference thread pools
+os.environ.setdefault('EMBEDDING_THREADS', str(max(1, (os.cpu_count() or 1) // workers)))
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master and cap inference threads"""
+    from database import engine
+    engine.dispose(close=False)
+
+    import app
+    app.configure_inference_threads()
+
+def post_worker_init(worker):
+    """Warm up the embedding model in each worker before it accepts requests"""
+    import app
+    app.warm_up_model()
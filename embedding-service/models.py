@@ -7,7 +7,7 @@ from sqlalchemy import Column, String, Text, Integer, DateTime, Float
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 import uuid
 
 Base = declarative_base()
@@ -30,7 +30,7 @@ class Article(Base):
     classifier_used = Column(String(50))
     
     # Vector embedding fields
-    embedding = Column(Vector(384), index=True)  # 384-dimensional vector for all-MiniLM-L6-v2
+    embedding = Column(HALFVEC(384))  # 384-dimensional half-precision vector for all-MiniLM-L6-v2 (HNSW-indexed)
     embedding_status = Column(String(20), default='pending')
     
     # Timestamps
@@ -0,0 +1,103 @@
+"""
+ONNX Runtime backend for the sentence transformer.
+Exports the transformer once, quantizes it to INT8 and serves it on the CPU.
+"""
+
+import os
+import logging
+import threading
+from typing import List
+
+import numpy as np
+import onnxruntime as ort
+from onnxruntime.quantization import quantize_dynamic, QuantType
+from optimum.onnxruntime import ORTModelForFeatureExtraction
+from transformers import AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+# ONNX configuration
+ONNX_CACHE_DIR = os.getenv('ONNX_CACHE_DIR', 'onnx_models')
+EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', os.cpu_count() or 1))
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2 truncates at 256 word pieces
+
+class OnnxSentenceEncoder:
+    """INT8-quantized sentence encoder with a SentenceTransformer-compatible encode()"""
+
+    def __init__(self, model_name: str, cache_dir: str = ONNX_CACHE_DIR):
+        model_dir = os.path.join(cache_dir, model_name.replace('/', '_'))
+        fp32_path = os.path.join(model_dir, 'model.onnx')
+        int8_path = os.path.join(model_dir, 'model.int8.onnx')
+
+        if not os.path.exists(int8_path):
+            logger.info(f"Exporting {model_name} to ONNX in {model_dir}")
+            ort_model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+            ort_model.save_pretrained(model_dir)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+            logger.info("Quantizing ONNX model to INT8")
+            quantize_dynamic(fp32_path, int8_path,
+                             weight_type=QuantType.QInt8,
+                             op_types_to_quantize=['MatMul', 'Attention'])
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model_path = int8_path
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> ort.InferenceSession:
+        """Inference session for the current process.
+
+        ONNX Runtime thread pools do not survive fork, so the session is
+        created lazily in each gunicorn worker rather than in the master.
+        """
+        with self._session_lock:
+            if self._session_pid != os.getpid():
+                self._create_session()
+        return self._session
+
+    def _create_session(self):
+        """Create the INT8 CPU inference session"""
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.intra_op_num_threads = EMBEDDING_THREADS
+        self._session = ort.InferenceSession(self.model_path, sess_options,
+                                             providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self._session.get_inputs()}
+        self._session_pid = os.getpid()
+
+    def encode(self, sentences: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Encode texts into mean-pooled, L2-normalized float32 embeddings.
+
+        Like SentenceTransformer.encode, texts are chunked in length order so
+        each chunk pads to similar lengths; results come back in input order.
+        """
+        batch_size = max(1, batch_size)
+        order = np.argsort([len(s) for s in sentences], kind="stable")
+        chunks = []
+        for start in range(0, len(sentences), batch_size):
+            chunks.append(self._encode_chunk([sentences[o] for o in order[start:start + batch_size]]))
+        if not chunks:
+            return np.empty((0, 0), dtype=np.float32)
+        sorted_embeddings = np.concatenate(chunks)
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+        return embeddings
+
+    def _encode_chunk(self, sentences: List[str]) -> np.ndarray:
+        """Run one padded batch through the session"""
+        tokens = self.tokenizer(sentences, padding=True, truncation=True,
+                                max_length=MAX_SEQ_LENGTH, return_tensors='np')
+        session = self.session
+        feeds = {name: tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+        hidden = session.run(None, feeds)[0]
+
+        # Mean pooling over non-padding tokens
+        mask = tokens['attention_mask'][..., np.newaxis].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        # L2 normalization (matches the model's Normalize module)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
@@ -0,0 +1,57 @@
+"""
+Tests for text cleaning used by the content classifier.
+Run with: python -m unittest test_text_cleaning
+"""
+
+import time
+import unittest
+
+from text_cleaning import clean_text_for_classification
+
+def best_time_ms(func, *args, runs=5):
+    """Fastest of several runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+class TestCleanTextForClassification(unittest.TestCase):
+    """Test clean_text_for_classification behaviour and complexity"""
+
+    def test_collapses_whitespace(self):
+        self.assertEqual(clean_text_for_classification("  a \n\t b  "), "a b")
+
+    def test_removes_urls(self):
+        text = "Read https://example.com/a?b=1 and http://x.org now"
+        self.assertEqual(clean_text_for_classification(text), "Read  and  now")
+
+    def test_removes_emails(self):
+        text = "Contact me@example.com or a@b for details"
+        self.assertEqual(clean_text_for_classification(text), "Contact  or  for details")
+
+    def test_keeps_dangling_at_signs(self):
+        self.assertEqual(clean_text_for_classification("x@ @y z"), "x@ @y z")
+
+    def test_truncates_long_text(self):
+        cleaned = clean_text_for_classification("a" * 1000)
+        self.assertEqual(cleaned, "a" * 400 + " " + "a" * 100)
+
+    def test_pathological_token_without_at_sign_is_linear(self):
+        # A bare \S+@\S+ backtracks from every suffix of this token (quadratic)
+        text = "a" * 10000
+        self.assertLess(best_time_ms(clean_text_for_classification, text), 1.0)
+
+    def test_pathological_url_is_linear(self):
+        text = "http://" + "a" * 10000
+        self.assertEqual(clean_text_for_classification(text), "")
+        self.assertLess(best_time_ms(clean_text_for_classification, text), 1.0)
+
+    def test_pathological_email_is_linear(self):
+        text = "a@" + "b" * 10000
+        self.assertEqual(clean_text_for_classification(text), "")
+        self.assertLess(best_time_ms(clean_text_for_classification, text), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+"""
+Text cleaning for the content classifier.
+Kept free of model and database imports so it can be imported on its own.
+"""
+
+import re
+
+# Precompiled text cleaning patterns (all linear-time: no ambiguous alternations)
+_WS_RE = re.compile(r'\s+')
+_URL_RE = re.compile(r'https?://\S+')
+# Anchored to token starts: a bare \S+@\S+ rescans every suffix of a long
+# token without '@', which is quadratic in the token length
+_EMAIL_RE = re.compile(r'(?<!\S)\S+@\S+')
+
+def clean_text_for_classification(text):
+    """Clean text for better classification results"""
+    # Remove excessive whitespace and newlines
+    text = _WS_RE.sub(' ', text.strip())
+    
+    # Remove URLs
+    text = _URL_RE.sub('', text)
+    
+    # Remove email addresses
+    text = _EMAIL_RE.sub('', text)
+    
+    # Truncate very long text for the classifier (BERT has token limits)
+    if len(text) > 500:
+        # Take first 400 chars and last 100 chars to preserve context
+        text = text[:400] + " " + text[-100:]
+    
+    return text.strip()
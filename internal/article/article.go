@@ -20,7 +20,7 @@ type Article struct {
 	RetryCount      int       `json:"retry_count" gorm:"default:0"`
 	ConfidenceScore float64   `json:"confidence_score" gorm:"default:0"`
 	ClassifierUsed  string    `json:"classifier_used" gorm:"size:50"`
-	Embedding       []float64 `json:"-" gorm:"type:vector(384);index"`                   // Store embedding for recommendations
+	Embedding       []float64 `json:"-" gorm:"type:halfvec(384);index"`                  // Store embedding for recommendations
 	EmbeddingStatus string    `json:"embedding_status" gorm:"size:20;default:'pending'"` // Track embedding generation status
 	CreatedAt       time.Time `json:"created_at" gorm:"autoCreateTime;index"`
 	UpdatedAt       time.Time `json:"updated_at" gorm:"autoUpdateTime"`
@@ -49,8 +49,8 @@ type Article struct {
 	ImageURL        string    `gorm:"size:2048"`
 	WordCount       int       `gorm:"default:0"`
 	MetadataStatus  string    `gorm:"size:20;default:'pending'"`
-	Embedding       []float64 `gorm:"type:vector(384);index" json:"-"` // Store embedding for recommendations
-	EmbeddingStatus string    `gorm:"size:20;default:'pending'"`       // Track embedding generation status
+	Embedding       []float64 `gorm:"type:halfvec(384);index" json:"-"` // Store embedding for recommendations
+	EmbeddingStatus string    `gorm:"size:20;default:'pending'"`        // Track embedding generation status
 	CreatedAt       time.Time `gorm:"autoCreateTime"`
 	UpdatedAt       time.Time `gorm:"autoUpdateTime"`
 }
@@ -97,13 +97,14 @@ func (r *gormRecommendationArticleRepository) FindSimilar(embedding []float64, u
 	embeddingStr := r.formatEmbeddingForPostgres(embedding)
 
 	// Use GORM's structured query builder with pgvector operations
-	// The <-> operator calculates cosine distance (0 = identical, 2 = opposite)
+	// The <=> operator calculates cosine distance (0 = identical, 2 = opposite)
+	// and is served by the HNSW halfvec_cosine_ops index
 	err := r.db.
 		Where("user_id != ?", userID).
 		Where("embedding IS NOT NULL").
 		Where("metadata_status = ?", "success").
 		Where("embedding_status = ?", "success").
-		Order(r.db.Raw("embedding <-> ?::vector", embeddingStr)).
+		Order(r.db.Raw("embedding <=> ?::halfvec", embeddingStr)).
 		Limit(limit).
 		Find(&articles).Error
 
@@ -117,7 +118,7 @@ func (r *gormRecommendationArticleRepository) FindSimilar(embedding []float64, u
 	return articles, nil
 }
 
-// formatEmbeddingForPostgres converts a float64 slice to PostgreSQL vector format
+// formatEmbeddingForPostgres converts a float64 slice to PostgreSQL vector/halfvec format
 func (r *gormRecommendationArticleRepository) formatEmbeddingForPostgres(embedding []float64) string {
 	if len(embedding) == 0 {
 		return "[]"
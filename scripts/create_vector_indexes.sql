@@ -1,13 +1,13 @@
 -- Create vector indexes for optimal similarity search performance
 -- This should be run after GORM has created the tables
 
--- Create IVFFlat index for embedding similarity search
--- IVFFlat is good for datasets with 1K+ vectors
--- The lists parameter should be roughly sqrt(total_rows)
-CREATE INDEX CONCURRENTLY IF NOT EXISTS articles_embedding_cosine_idx 
+-- Create HNSW index for embedding similarity search
+-- Embeddings are stored as halfvec(384) (pgvector 0.7+), halving index size
+-- HNSW needs no training data and gives better recall/latency than IVFFlat
+CREATE INDEX CONCURRENTLY IF NOT EXISTS articles_embedding_hnsw 
 ON articles 
-USING ivfflat (embedding vector_cosine_ops) 
-WITH (lists = 100);
+USING hnsw (embedding halfvec_cosine_ops) 
+WITH (m = 16, ef_construction = 64);
 
 -- Create index for embedding status to quickly find articles with embeddings
 CREATE INDEX CONCURRENTLY IF NOT EXISTS articles_embedding_status_idx 
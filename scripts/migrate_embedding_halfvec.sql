@@ -0,0 +1,26 @@
+-- Migrate article embeddings from vector(384) to halfvec(384) with an HNSW index
+-- Requires pgvector 0.7+ (halfvec type and halfvec_cosine_ops)
+-- Halves embedding storage and index size; cosine ranking is unaffected
+--
+-- Run this BEFORE deploying an API build whose Article.Embedding column is
+-- halfvec(384) (`make migrate-halfvec`). Otherwise GORM AutoMigrate tries to
+-- ALTER the column while articles_embedding_cosine_idx (vector_cosine_ops)
+-- still exists, the ALTER fails and the API exits at startup.
+-- Not needed for databases created fresh by the halfvec API build.
+
+-- Drop the IVFFlat index built on the full-precision column
+DROP INDEX CONCURRENTLY IF EXISTS articles_embedding_cosine_idx;
+
+-- Convert stored embeddings to half precision
+ALTER TABLE articles 
+ALTER COLUMN embedding TYPE halfvec(384) 
+USING embedding::halfvec(384);
+
+-- Create HNSW index for cosine distance (<=>) queries
+CREATE INDEX CONCURRENTLY IF NOT EXISTS articles_embedding_hnsw 
+ON articles 
+USING hnsw (embedding halfvec_cosine_ops) 
+WITH (m = 16, ef_construction = 64);
+
+-- Analyze table to update statistics
+ANALYZE articles;